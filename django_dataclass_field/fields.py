@@ -1,25 +1,43 @@
 import dataclasses
+import functools
 import json
+import re
+import sys
+import types
+import typing
 from enum import Enum
-from typing import Any, Dict, Optional, Type
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
 
+import orjson
 from dacite import Config, MissingValueError, from_dict
 from django import forms
 from django.core.exceptions import ValidationError
 from django.db.models import JSONField, Model
+from django.db.models.fields.json import KeyTransform
 from django.forms.fields import InvalidJSONInput, JSONString
 from django.forms.widgets import Widget
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+_DC_CONFIG = Config(cast=[Enum, Dict])
+
 
 class JSONWidget(Widget):
     template_name = "django_dataclass_field/admin/jsonwidget.html"
     is_hidden = False
+    # Widget.__init__ copies the attrs it's given, so this is never mutated.
+    _DEFAULTS = {"cols": "40", "rows": "20"}
 
     def __init__(self, attrs=None):
-        default_attrs = {"cols": "40", "rows": "20"}
         if attrs:
-            default_attrs.update(attrs)
-        super().__init__(default_attrs)
+            attrs = {**self._DEFAULTS, **attrs}
+        else:
+            attrs = self._DEFAULTS
+        super().__init__(attrs)
 
 
 class DataClassFormField(forms.JSONField):
@@ -27,12 +45,25 @@ class DataClassFormField(forms.JSONField):
         "invalid": "Enter valid JSON representation of the Dataclass."
     }
     widget = JSONWidget
-
-    def __init__(self, encoder=None, decoder=None, **kwargs):
+    # The last string to_python decoded and its decoded value, for bound_data
+    # to reuse when rendering the same submitted data. The string is kept (and
+    # compared by identity) rather than its id(), which could be reused.
+    _last_parse: Optional[Tuple[Any, Any]] = None
+
+    def __init__(
+        self, encoder=None, decoder=None, data_class=None, value_types=None, **kwargs
+    ):
         self.encoder = encoder
         self.decoder = decoder
+        self._data_class = data_class
+        # The classes whose instances are dumped with data_class's dumper,
+        # e.g. both a slotted copy and the original dataclass.
+        self._value_types = value_types or (data_class,)
+        self._dumper = _build_dumper(data_class) if data_class is not None else None
         schema = kwargs.pop("schema", None)
-        self.widget = JSONWidget(attrs={"schema": json.dumps(schema)})
+        if not isinstance(schema, str):
+            schema = json.dumps(schema)
+        self.widget = JSONWidget(attrs={"schema": schema})
         super().__init__(**kwargs)
 
     def to_python(self, value):
@@ -43,13 +74,14 @@ class DataClassFormField(forms.JSONField):
         elif isinstance(value, (list, dict, int, float, JSONString)):
             return value
         try:
-            converted = json.loads(value, cls=self.decoder)
+            converted = self._loads(value)
         except json.JSONDecodeError:
             raise ValidationError(
                 self.error_messages["invalid"],
                 code="invalid",
                 params={"value": value},
             )
+        self._last_parse = (value, converted)
         if isinstance(converted, str):
             return JSONString(converted)
         else:
@@ -60,36 +92,81 @@ class DataClassFormField(forms.JSONField):
             return initial
         if data is None:
             return None
+        if self._last_parse is not None and self._last_parse[0] is data:
+            return self._last_parse[1]
         try:
-            return json.loads(data, cls=self.decoder)
+            return self._loads(data)
         except json.JSONDecodeError:
             return InvalidJSONInput(data)
 
     def prepare_value(self, value):
-        if dataclasses.is_dataclass(value):
-            value = dataclasses.asdict(value)
+        value = self._dump_dataclass(value)
         if isinstance(value, InvalidJSONInput):
             return value
+        if self.encoder is None:
+            try:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+            except orjson.JSONEncodeError:
+                # e.g. ints beyond 64 bits, which only the json module handles.
+                pass
         return json.dumps(value, ensure_ascii=False, cls=self.encoder)
 
+    def _dump_dataclass(self, value):
+        if self._data_class is None:
+            if dataclasses.is_dataclass(value):
+                return _to_builtins(value)
+        elif isinstance(value, self._value_types):
+            return self._dumper(value)  # type: ignore
+        return value
+
+    def _loads(self, value):
+        return _json_loads(value, self.decoder)
+
     def has_changed(self, initial, data):
-        if super().has_changed(initial, data):
+        if self.disabled:
+            return False
+        try:
+            data = self.to_python(data)
+        except ValidationError:
+            return True
+        initial = self._dump_dataclass(initial)
+        if initial != data:
             return True
         # For purposes of seeing whether something has changed, True isn't the
-        # same as 1 and the order of keys doesn't matter.
-        return json.dumps(initial, sort_keys=True, cls=self.encoder) != json.dumps(
-            self.to_python(data), sort_keys=True, cls=self.encoder
-        )
+        # same as 1 and the order of keys doesn't matter. The values are equal,
+        # so their dicts have the same keys and putting them in the same order
+        # is enough to compare the encoded JSON, without sorting.
+        data = _match_key_order(data, initial)
+        if self.encoder is None:
+            try:
+                return orjson.dumps(initial, option=orjson.OPT_NON_STR_KEYS) != orjson.dumps(
+                    data, option=orjson.OPT_NON_STR_KEYS
+                )
+            except orjson.JSONEncodeError:
+                pass
+        return json.dumps(initial, cls=self.encoder) != json.dumps(data, cls=self.encoder)
 
 
 class DataClassField(JSONField):
     description = "Map Python Dataclasses to model fields."
+    # Whether get_prep_value checks that non-dataclass values (e.g. plain
+    # dicts) can be loaded into the dataclass. Forms and the admin already
+    # validate through clean() -> to_python(), so this only matters for
+    # values assigned programmatically.
+    validate_on_save = False
+    # Whether to load values into a copy of the dataclass with __slots__, if
+    # it doesn't have them already. This roughly halves the memory used by
+    # each loaded value, but the copy is a different class: its instances
+    # don't compare equal to instances of the original class and can't be
+    # pickled, and methods using zero-argument super() fail on them since
+    # __class__ still refers to the original. Instances of either class can
+    # be saved. Needs Python 3.10+.
+    auto_slots = False
 
     def formfield(self, **kwargs):
-        try:
-            kwargs["schema"] = generate_schema(self.data_class)
-        except Exception:
-            kwargs["schema"] = {}
+        kwargs["schema"] = _schema_json(self.data_class)
+        kwargs["data_class"] = self.data_class
+        kwargs["value_types"] = self._value_types
         return super().formfield(
             **{
                 "form_class": DataClassFormField,
@@ -102,10 +179,24 @@ class DataClassField(JSONField):
         return self.get_prep_value(value)
 
     def __init__(self, data_class, dacite_config: Optional[Config] = None, *args, **kwargs):
+        self._value_types: Tuple[type, ...] = (data_class,)
+        if self.auto_slots and "__slots__" not in vars(data_class):
+            slotted = _slotted_copy(data_class)
+            if slotted is not data_class:
+                self._value_types = (slotted, data_class)
+                data_class = slotted
         self.data_class = data_class
-        self.dacite_config = dacite_config or Config(
-            cast=[Enum, Dict],
-        )
+        self._dumper = _build_dumper(data_class)
+        self.dacite_config = dacite_config or _DC_CONFIG
+        if _is_struct(data_class):
+            # msgspec Structs are loaded by msgspec rather than dacite.
+            self._struct_decoder = msgspec.json.Decoder(data_class)
+            self._loader = None
+        else:
+            self._struct_decoder = None
+            # A custom dacite config may carry type hooks the generated loader
+            # knows nothing about, so only the default config gets one.
+            self._loader = _build_loader(data_class) if dacite_config is None else None
         super().__init__(*args, **kwargs)
 
     @property
@@ -120,9 +211,34 @@ class DataClassField(JSONField):
         return name, path, args, kwargs
 
     def from_db_value(self, value, expression, connection):
-        from_db = super().from_db_value(value, expression, connection)
+        if value is None:
+            return value
+        if isinstance(expression, KeyTransform):
+            # e.g. values("car_data__brand"), which selects a value from
+            # within the JSON rather than the dataclass itself.
+            return super().from_db_value(value, expression, connection)
+        if self._struct_decoder is not None:
+            if type(value) is str:
+                return self._struct_decoder.decode(value)
+            from_db = super().from_db_value(value, expression, connection)
+            return msgspec.convert(from_db, self.data_class)
+        if self.decoder is None and type(value) is str:
+            try:
+                from_db = _json_loads(value)
+            except json.JSONDecodeError:
+                # JSONField.from_db_value returns such values as they are.
+                from_db = value
+        else:
+            from_db = super().from_db_value(value, expression, connection)
         if from_db is None:
             return from_db
+        if self._loader is not None:
+            try:
+                return self._loader(from_db)
+            except Exception:
+                # e.g. rows written before the dataclass changed shape; let
+                # dacite handle them (and report anything it can't).
+                pass
         return from_dict(
             data_class=self.data_class, data=from_db, config=self.dacite_config,
         )
@@ -130,12 +246,28 @@ class DataClassField(JSONField):
     def to_python(self, value):
         if value is None:
             return value
-        if isinstance(value, self.data_class):
+        value_type = type(value)
+        if value_type is self.data_class:
             return value
-        if isinstance(value, str):
-            obj = json.loads(value)
+        if value_type is dict:
+            obj = value
+        elif value_type is str:
+            obj = _json_loads(value)
+        elif isinstance(value, self._value_types):
+            return value
+        elif isinstance(value, str):
+            obj = _json_loads(value)
         else:
             obj = value
+        if self._struct_decoder is not None:
+            try:
+                return msgspec.convert(obj, self.data_class)
+            except msgspec.ValidationError:
+                raise ValidationError(
+                    message=f"Value must be of type {self.data_class.__name__}",
+                    code="invalid",
+                    params={"value": value},
+                )
         try:
             return from_dict(data_class=self.data_class, data=obj, config=self.dacite_config)
         except ValidationError:
@@ -154,7 +286,7 @@ class DataClassField(JSONField):
     def validate(self, value: Any, _: Optional[Model]) -> None:
         if value is None:
             return
-        if isinstance(value, self.data_class):
+        if type(value) is self.data_class or isinstance(value, self._value_types):
             return
         raise ValidationError(
             message=f"Value must be of type {self.data_class.__name__}",
@@ -177,66 +309,499 @@ class DataClassField(JSONField):
         """
         if value is None:
             return value
-        if not isinstance(value, self.data_class):
-            # validate that this is valid data for the dataclass
-            self.to_python(value)
+        if not isinstance(value, self._value_types):
+            if self.validate_on_save:
+                # validate that this is valid data for the dataclass
+                self.to_python(value)
             return super().get_prep_value(value)
         # convert Python objects back to query values
-        return super().get_prep_value(dataclasses.asdict(value))
-
-
-def _lookup_scalar(type_hint: str) -> str:
-    if type_hint == "str":
-        return "string"
-    elif type_hint == "int" or type_hint == "float":
-        return "number"
-    elif type_hint == "dict":
-        return "object"
-    elif type_hint == "list":
-        return "array"
-    elif type_hint == "bool":
-        return "boolean"
-    elif type_hint == "None":
-        return "null"
-    else:
-        raise ValueError("Unhandled type: %s" % type_hint)
-
-
-def parse_type(type_hint: str) -> Dict[str, Any]:
+        if type(value) in self._value_types or self._struct_decoder is not None:
+            return super().get_prep_value(self._dumper(value))
+        # a subclass instance, whose extra fields the dumper would leave out
+        return super().get_prep_value(_to_builtins(value))
+
+
+# orjson decodes integers beyond 64 bits as floats, losing precision. Those
+# have at least 20 digits, so only strings with such a run of digits need the
+# json module (which may also be due to a long string or fraction).
+_LONG_NUMBER = re.compile(r"\d{20}")
+
+
+def _json_loads(value: str, decoder: Optional[Type[json.JSONDecoder]] = None) -> Any:
+    """
+    Decode `value` like json.loads(value, cls=decoder), with orjson where it
+    gives the same result.
+    """
+    if decoder is None and not _LONG_NUMBER.search(value):
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            # e.g. NaN or Infinity, which the json module writes and accepts.
+            pass
+    return json.loads(value, cls=decoder)
+
+
+def _match_key_order(value: Any, like: Any) -> Any:
+    """
+    Rebuild the dicts in `value` with their keys in the order of those in
+    `like`, which must compare equal to `value`.
+    """
+    if type(value) is dict and type(like) is dict:
+        return {k: _match_key_order(value[k], like[k]) for k in like}
+    if type(value) is list and type(like) is list:
+        return [_match_key_order(v, l) for v, l in zip(value, like)]
+    return value
+
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _is_struct(tp: Any) -> bool:
+    return msgspec is not None and isinstance(tp, type) and issubclass(tp, msgspec.Struct)
+
+
+def _to_builtins(value: Any) -> Any:
+    """
+    Convert a dataclass instance into JSON-serializable builtins.
+
+    Unlike dataclasses.asdict, this reads the fields directly and does not
+    deepcopy the leaf values, which are passed through untouched unless they
+    are containers, dataclasses, or enums.
+    """
+    if dataclasses.is_dataclass(value):
+        return {
+            f.name: _to_builtins(getattr(value, f.name))
+            for f in dataclasses.fields(value)
+        }
+    if isinstance(value, (list, tuple)):
+        return [_to_builtins(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_builtins(v) for k, v in value.items()}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+# Methods the dataclass decorator generates, which _slotted_copy leaves to
+# make_dataclass to generate again for the copy.
+_DATACLASS_METHODS = frozenset({
+    "__init__", "__repr__", "__eq__", "__hash__", "__lt__", "__le__", "__gt__",
+    "__ge__", "__setattr__", "__delattr__",
+})
+
+
+def _generated_method(value: Any) -> bool:
+    """
+    Whether `value` is a method the dataclass decorator generated (rather than
+    one the class defined), or the None it sets __hash__ to.
+    """
+    if value is None:
+        return True
+    # The decorator creates its methods with exec() and wraps __repr__.
+    code = getattr(getattr(value, "__wrapped__", value), "__code__", None)
+    return code is not None and code.co_filename == "<string>"
+
+
+@functools.lru_cache(maxsize=None)
+def _slotted_copy(dc: type) -> type:
+    """
+    Return a copy of the dataclass `dc` with __slots__, or `dc` itself if it
+    can't be copied (a msgspec Struct, a subclass, a dataclass with InitVars,
+    or Python < 3.10).
+
+    The copy keeps the original's name and module, so references to it (e.g.
+    in migrations) resolve to the original class.
+    """
+    if sys.version_info < (3, 10) or not dataclasses.is_dataclass(dc):
+        return dc
+    if dc.__bases__ != (object,):
+        return dc
+    if any(
+        f._field_type is dataclasses._FIELD_INITVAR  # type: ignore
+        for f in dc.__dataclass_fields__.values()  # type: ignore
+    ):
+        # fields() leaves them out, so the copy's __init__ wouldn't take them.
+        return dc
+    fields = dataclasses.fields(dc)
+    field_names = {f.name for f in fields}
+    namespace = {
+        k: v
+        for k, v in vars(dc).items()
+        if not (k in _DATACLASS_METHODS and _generated_method(v))
+        and k not in field_names
+        and k not in ("__dict__", "__weakref__", "__annotations__")
+        and not k.startswith("__dataclass_")
+    }
+    params = dc.__dataclass_params__  # type: ignore
+    slotted = dataclasses.make_dataclass(
+        dc.__name__,
+        [
+            (
+                f.name,
+                f.type,
+                dataclasses.field(  # type: ignore
+                    default=f.default,
+                    default_factory=f.default_factory,
+                    init=f.init,
+                    repr=f.repr,
+                    hash=f.hash,
+                    compare=f.compare,
+                    metadata=f.metadata,
+                    kw_only=f.kw_only,
+                ),
+            )
+            for f in fields
+        ],
+        namespace=namespace,
+        init=params.init,
+        repr=params.repr,
+        eq=params.eq,
+        order=params.order,
+        unsafe_hash=params.unsafe_hash,
+        frozen=params.frozen,
+        slots=True,
+    )
+    slotted.__module__ = dc.__module__
+    slotted.__qualname__ = dc.__qualname__
+    return slotted
+
+
+_UNION_TYPES: Tuple[Any, ...] = (Union,)
+if hasattr(types, "UnionType"):  # X | Y, Python 3.10+
+    _UNION_TYPES += (types.UnionType,)  # type: ignore
+
+_Loader = Callable[[Dict[str, Any]], Any]
+
+# Generated loaders keyed by dataclass. None marks a dataclass the loader
+# can't handle, _BUILDING one whose loader is still being generated.
+_loaders: Dict[type, Optional[_Loader]] = {}
+_BUILDING: Any = object()
+
+
+def _build_loader(dc: type) -> Optional[_Loader]:
+    """
+    Generate a function building `dc` from its decoded JSON representation.
+
+    This does what dacite.from_dict does with the default Enum/Dict casts, but
+    the type hints are resolved once here rather than on every call, e.g.:
+
+        def _load(d):
+            v0 = d['year']
+            if not isinstance(v0, _t0):
+                raise TypeError('year')
+            v1 = _c1(d['color'])
+            if 'nick' in d:
+                v2 = d['nick']
+                if not isinstance(v2, _t2):
+                    raise TypeError('nick')
+            else:
+                v2 = _d2
+            return _cls(year=v0, color=v1, nick=v2)
+
+    Like dacite, values of scalar, list and dict fields are type checked, but
+    unlike dacite the items of lists and dicts aren't. Returns None if a
+    field's type isn't supported.
+    """
+    loader = _loaders.get(dc)
+    if loader is _BUILDING:
+        # Self-referencing dataclass; resolve the loader when it's called.
+        return lambda d: _loaders[dc](d)  # type: ignore
+    if dc in _loaders:
+        return loader
+
+    _loaders[dc] = _BUILDING
+    ns: Dict[str, Any] = {"_cls": dc}
+    lines = []
+    args = []
+    try:
+        hints = typing.get_type_hints(dc)
+        for i, f in enumerate(dataclasses.fields(dc)):
+            if not f.init:
+                raise TypeError("Unsupported field: %s" % f.name)
+            # Keys are emitted as string literals, which the compiler interns,
+            # so lookups here and the keys of dumped dicts share one object.
+            value = "d[%r]" % f.name
+            body = []
+            checked = _checked_types(hints[f.name])
+            if checked is not None:
+                ns["_t%d" % i] = checked
+                body += [
+                    "v%d = %s" % (i, value),
+                    "if not isinstance(v%d, _t%d):" % (i, i),
+                    "    raise TypeError(%r)" % f.name,
+                ]
+                value = "v%d" % i
+            convert = _value_loader(hints[f.name])
+            if convert is not None:
+                ns["_c%d" % i] = convert
+                value = "_c%d(%s)" % (i, value)
+            if value != "v%d" % i:
+                body.append("v%d = %s" % (i, value))
+
+            if f.default is not dataclasses.MISSING:
+                ns["_d%d" % i] = f.default
+                default = "_d%d" % i
+            elif f.default_factory is not dataclasses.MISSING:
+                ns["_f%d" % i] = f.default_factory
+                default = "_f%d()" % i
+            else:
+                default = None
+            if default is None:
+                lines += body
+            else:
+                lines.append("if %r in d:" % f.name)
+                lines += ["    " + line for line in body]
+                lines += ["else:", "    v%d = %s" % (i, default)]
+            args.append("%s=v%d" % (f.name, i))
+    except (NameError, TypeError):
+        _loaders[dc] = None
+        return None
+
+    lines.append("return _cls(%s)" % ", ".join(args))
+    src = "def _load(d):\n%s\n" % "\n".join("    " + line for line in lines)
+    exec(src, ns)
+    _loaders[dc] = ns["_load"]
+    return ns["_load"]
+
+
+def _checked_types(tp: Any) -> Optional[Tuple[type, ...]]:
+    """
+    The types a value for `tp` is checked against by the generated loader, or
+    None if it's left to the conversion (or not checked at all).
+    """
+    if tp is float:
+        # dacite accepts ints for floats, e.g. 1 rather than 1.0.
+        return (int, float)
+    if tp in _SCALAR_TYPES or tp in (dict, list):
+        return (tp,)
+    origin = typing.get_origin(tp)
+    if origin in (dict, list):
+        return (origin,)
+    if origin in _UNION_TYPES and all(a in _SCALAR_TYPES for a in typing.get_args(tp)):
+        args = typing.get_args(tp)
+        return args + (int,) if float in args else args
+    return None
+
+
+def _value_loader(tp: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Return a function converting a decoded JSON value to `tp`, or None if the
+    value can be used as-is. Raises TypeError for unsupported types.
+    """
+    if tp in _SCALAR_TYPES or tp in (Any, dict, list):
+        return None
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return tp
+    if dataclasses.is_dataclass(tp):
+        nested = _build_loader(tp)  # type: ignore
+        if nested is None:
+            raise TypeError("Unsupported dataclass: %r" % tp)
+        return nested
+    if _is_struct(tp):
+        return functools.partial(msgspec.convert, type=tp)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is dict:
+        if args and _value_loader(args[1]) is not None:
+            raise TypeError("Unsupported type: %r" % tp)
+        return None
+    if origin is list:
+        item = _value_loader(args[0]) if args else None
+        if item is None:
+            return None
+        return lambda v: [item(x) for x in v]  # type: ignore
+    if origin in _UNION_TYPES:
+        non_null = [a for a in args if a is not type(None)]
+        if all(a in _SCALAR_TYPES for a in non_null):
+            return None
+        if len(non_null) == 1 and len(args) == 2:
+            inner = _value_loader(non_null[0])
+            if inner is None:
+                return None
+            return lambda v: None if v is None else inner(v)  # type: ignore
+    raise TypeError("Unsupported type: %r" % tp)
+
+
+_Dumper = Callable[[Any], Dict[str, Any]]
+
+# Generated dumpers keyed by dataclass, see _loaders.
+_dumpers: Dict[type, _Dumper] = {}
+
+
+def _build_dumper(dc: type) -> _Dumper:
+    """
+    Generate a function converting an instance of `dc` into JSON-serializable
+    builtins, the counterpart to _build_loader, e.g.:
+
+        def _dump(o):
+            return {
+                'brand': o.brand,
+                'color': _c1(o.color),
+                'engine': _c2(o.engine),
+            }
+
+    Fields whose type hint can't be resolved or isn't recognised are converted
+    with _to_builtins.
+    """
+    if _is_struct(dc):
+        return msgspec.to_builtins
+    dumper = _dumpers.get(dc)
+    if dumper is _BUILDING:
+        return lambda o: _dumpers[dc](o)
+    if dumper is not None:
+        return dumper
+
+    _dumpers[dc] = _BUILDING
     try:
-        if "|" in type_hint:
-            types = [_lookup_scalar(t.strip()) for t in type_hint.split("|")]
-            return {"anyOf": [{"type": t} for t in types]}
+        try:
+            hints = typing.get_type_hints(dc)
+        except (NameError, TypeError):
+            # e.g. `list[int]` under `from __future__ import annotations`
+            # before Python 3.9; those fields fall back to _to_builtins.
+            hints = {}
+        ns: Dict[str, Any] = {}
+        lines = []
+        for i, f in enumerate(dataclasses.fields(dc)):
+            value = "o.%s" % f.name
+            convert = _value_dumper(hints.get(f.name))
+            if convert is not None:
+                ns["_c%d" % i] = convert
+                value = "_c%d(%s)" % (i, value)
+            lines.append("        %r: %s,\n" % (f.name, value))
+
+        src = "def _dump(o):\n    return {\n%s    }\n" % "".join(lines)
+        exec(src, ns)
+        _dumpers[dc] = ns["_dump"]
+    finally:
+        if _dumpers.get(dc) is _BUILDING:
+            del _dumpers[dc]
+    return ns["_dump"]
+
+
+def _enum_value(value: Any) -> Any:
+    # Enum fields may also hold the raw value, e.g. Car(color="red").
+    return value.value if isinstance(value, Enum) else value
+
+
+def _value_dumper(tp: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Return a function converting a value of type `tp` into JSON-serializable
+    builtins, or None if it can be used as-is.
+    """
+    if tp in _SCALAR_TYPES:
+        return None
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return _enum_value
+    if _is_struct(tp):
+        return _build_dumper(tp)
+    if dataclasses.is_dataclass(tp):
+        dumper = _build_dumper(tp)  # type: ignore
+        # The value may still be None or an instance of a subclass, with
+        # fields the generated dumper doesn't know about.
+        return lambda v: dumper(v) if type(v) is tp else _to_builtins(v)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is dict and args and _value_dumper(args[1]) is None:
+        return None
+    if origin is list and args:
+        item = _value_dumper(args[0])
+        if item is None:
+            return None
+        return lambda v: [item(x) for x in v]  # type: ignore
+    if origin in _UNION_TYPES:
+        non_null = [a for a in args if a is not type(None)]
+        if all(a in _SCALAR_TYPES for a in non_null):
+            return None
+        if len(non_null) == 1 and len(args) == 2:
+            inner = _value_dumper(non_null[0])
+            if inner is None:
+                return None
+            return lambda v: None if v is None else inner(v)  # type: ignore
+    return _to_builtins
+
+
+_SCALAR = {
+    str: "string",
+    int: "number",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+    type(None): "null",
+}
+
 
-        if type_hint.startswith("Optional["):
-            return {"type": _lookup_scalar(type_hint[9:-1])}
+def _schema_for(tp: Any) -> Dict[str, Any]:
+    """
+    JSON schema for a resolved type hint, or an empty (match anything) schema
+    for types it doesn't know.
+    """
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
 
-        if type_hint.startswith("List["):
-            return {"type": "array", "items": {"type": _lookup_scalar(type_hint[5:-1])}}
+    if origin in _UNION_TYPES:
+        options = [_schema_for(a) for a in args]
+        return {"anyOf": options} if all(options) else {}
 
-        return {"type": _lookup_scalar(type_hint)}
-    except ValueError:
-        return {}
+    if origin is list:
+        items = _schema_for(args[0]) if args else {}
+        return {"type": "array", "items": items} if items else {"type": "array"}
 
+    if origin is dict:
+        return {"type": "object"}
+
+    scalar = _SCALAR.get(tp)
+    return {"type": scalar} if scalar else {}
+
+
+_SCHEMA_URI = "http://json-schema.org/draft-07/schema#"
+
+
+@functools.lru_cache(maxsize=None)
 def generate_schema(dc: Type[dataclasses.dataclass]):  # type: ignore
-    schema = {
-        "$schema": "http://json-schema.org/draft-07/schema#",
+    """
+    Build the JSON schema for a dataclass. The result is cached per dataclass,
+    so it must not be mutated.
+    """
+    properties: Dict[str, Any] = {}
+    required = []
+
+    try:
+        hints = typing.get_type_hints(dc)
+    except (NameError, TypeError):
+        # e.g. an unresolvable forward reference; fields without a resolved
+        # hint just get an empty schema.
+        hints = {}
+    for dc_field in dataclasses.fields(dc):
+        dc_key = dc_field.name
+        properties[dc_key] = _schema_for(hints.get(dc_key, dc_field.type))
+        if dc_field.default is not dataclasses.MISSING:
+            properties[dc_key]["default"] = dc_field.default
+
+        if dc_field.init:
+            required.append(dc_key)
+
+    return {
+        "$schema": _SCHEMA_URI,
         "type": "object",
-        "properties": {},
-        "required": [],
+        "properties": properties,
+        "required": required,
         "additionalProperties": False,
     }
 
-    for dc_key, dc_field in dc.__dataclass_fields__.items():  # type: ignore
-        has_default_defined = type(dc_field.default) == dataclasses._MISSING_TYPE  # type: ignore
-
-        if not has_default_defined:
-            schema["properties"][dc_key] = parse_type(str(dc_field.type))  # type: ignore
-            schema["properties"][dc_key]["default"] = dc_field.default  # type: ignore
-        else:
-            schema["properties"][dc_key] = parse_type(str(dc_field.type))  # type: ignore
 
-        if dc_field.init:
-            schema["required"].append(dc_key)  # type: ignore
-
-    return schema
+@functools.lru_cache(maxsize=None)
+def _schema_json(dc: Type[dataclasses.dataclass]) -> str:  # type: ignore
+    """
+    The JSON-encoded schema for the admin widget. msgspec Structs get the
+    schema msgspec generates for them. If no schema can be generated an empty
+    one is used, and that result is cached too.
+    """
+    try:
+        if _is_struct(dc):
+            return json.dumps(msgspec.json.schema(dc))
+        return json.dumps(generate_schema(dc))
+    except Exception:
+        return "{}"
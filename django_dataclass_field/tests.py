@@ -1,3 +1,458 @@
-from django.test import TestCase
+import dataclasses
+import json
+import sys
+import unittest
+from enum import Enum
+from typing import Any, Dict, List, Optional
 
-# Create your tests here.
+from dacite import WrongTypeError
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.test import SimpleTestCase, TestCase
+from django.utils.module_loading import import_string
+
+from django_dataclass_field.fields import (
+    _BUILDING,
+    DataClassField,
+    _build_loader,
+    _dumpers,
+    _slotted_copy,
+    generate_schema,
+)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclasses.dataclass
+class Engine:
+    hp: int
+    kind: str = "gas"
+
+
+@dataclasses.dataclass
+class TurboEngine(Engine):
+    boost: float = 1.0
+
+
+@dataclasses.dataclass
+class Car:
+    brand: str
+    year: int
+    color: Color
+    engine: Engine
+    spares: List[Engine] = dataclasses.field(default_factory=list)
+    nick: Optional[str] = None
+
+
+@dataclasses.dataclass
+class Trim:
+    name: str
+    extra: Optional[str]
+
+
+@dataclasses.dataclass
+class Node:
+    name: str
+    children: List["Node"] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class Options:
+    tags: Optional[List[str]] = None
+    counts: Optional[Dict[str, int]] = None
+    colors: List[Color] = dataclasses.field(default_factory=list)
+    favourite: Optional[Color] = None
+    by_name: Dict[str, Engine] = dataclasses.field(default_factory=dict)
+    backup: Optional[Engine] = None
+
+
+@dataclasses.dataclass
+class Unresolvable:
+    x: "int | 'str'"
+
+
+@dataclasses.dataclass(frozen=True)
+class Point:
+    """A point."""
+
+    x: int
+    y: int = 0
+    labels: List[str] = dataclasses.field(default_factory=list)
+
+    def norm(self):
+        return abs(self.x) + abs(self.y)
+
+    def describe(self):
+        return super().__repr__()
+
+
+@dataclasses.dataclass
+class Reading:
+    value: float
+    extra: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class Counter:
+    n: int
+
+
+class Garage(models.Model):
+    car = DataClassField(Car, null=True)
+    reading = DataClassField(Reading, null=True)
+    counter = DataClassField(Counter, null=True)
+
+    class Meta:
+        app_label = "django_dataclass_field"
+
+
+@dataclasses.dataclass
+class Scaled:
+    a: int
+    scale: dataclasses.InitVar[int] = 1
+
+    def __post_init__(self, scale):
+        self.a *= scale
+
+
+@dataclasses.dataclass
+class Tag:
+    name: str
+
+    def __repr__(self):
+        return "#" + self.name
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.name.lower() == other.name.lower()
+
+    __hash__ = None  # type: ignore
+
+
+class SlottedDataClassField(DataClassField):
+    auto_slots = True
+
+
+def round_trip(field, value):
+    return load(field, field.get_prep_value(value))
+
+
+def load(field, data):
+    return field.from_db_value(json.dumps(data), None, connection)
+
+
+class LoaderTests(SimpleTestCase):
+    def test_generated_for_supported_dataclasses(self):
+        for dc in (Engine, Car, Trim, Node):
+            self.assertIsNotNone(_build_loader(dc), dc)
+
+    def test_nested_and_enum(self):
+        car = load(
+            DataClassField(Car),
+            {
+                "brand": "Toyota",
+                "year": 2022,
+                "color": "red",
+                "engine": {"hp": 100, "kind": "hybrid"},
+                "spares": [{"hp": 5}],
+                "nick": "P",
+            },
+        )
+        self.assertEqual(
+            car,
+            Car("Toyota", 2022, Color.RED, Engine(100, "hybrid"), [Engine(5)], "P"),
+        )
+
+    def test_defaults(self):
+        field = DataClassField(Car)
+        data = {"brand": "Toyota", "year": 2022, "color": "blue", "engine": {"hp": 1}}
+        first = load(field, data)
+        second = load(field, data)
+        self.assertEqual(first, Car("Toyota", 2022, Color.BLUE, Engine(1, "gas")))
+        # default_factory is called for each row
+        self.assertIsNot(first.spares, second.spares)
+
+    def test_missing_optional_falls_back_to_dacite(self):
+        self.assertEqual(load(DataClassField(Trim), {"name": "LE"}), Trim("LE", None))
+
+    def test_self_referencing(self):
+        node = load(
+            DataClassField(Node),
+            {"name": "a", "children": [{"name": "b", "children": [{"name": "c"}]}]},
+        )
+        self.assertEqual(node, Node("a", [Node("b", [Node("c")])]))
+
+    def test_int_for_float(self):
+        @dataclasses.dataclass
+        class Measure:
+            value: float
+            limit: Optional[float] = None
+
+        loader = _build_loader(Measure)
+        self.assertEqual(loader({"value": 1, "limit": 2}), Measure(1, 2))
+        self.assertEqual(loader({"value": 1.5}), Measure(1.5))
+        with self.assertRaises(TypeError):
+            loader({"value": "1"})
+
+    def test_nan(self):
+        # Django writes JSON with the json module, which allows NaN.
+        reading = load(
+            DataClassField(Reading), {"value": float("nan"), "extra": {"x": float("inf")}}
+        )
+        self.assertNotEqual(reading.value, reading.value)
+        self.assertEqual(reading.extra, {"x": float("inf")})
+
+    def test_wrong_type_falls_back_to_dacite(self):
+        field = DataClassField(Car)
+        data = {"brand": "Toyota", "year": "1999", "color": "red", "engine": {"hp": 1}}
+        with self.assertRaises(WrongTypeError):
+            load(field, data)
+        with self.assertRaises(WrongTypeError):
+            load(field, {**data, "year": 1999, "nick": 5})
+
+
+class SchemaTests(SimpleTestCase):
+    def test_unresolvable_type_hints(self):
+        @dataclasses.dataclass
+        class Partial:
+            x: "int | 'str'"
+            n: int = 0
+
+        schema = generate_schema(Partial)
+        self.assertEqual(schema["properties"]["x"], {})
+        self.assertEqual(schema["properties"]["n"], {"type": "number", "default": 0})
+
+
+class DatabaseTests(TestCase):
+    def test_big_ints(self):
+        Garage.objects.create(
+            counter=Counter(2**70), reading=Reading(1, {"x": -(2**64)})
+        )
+        garage = Garage.objects.get()
+        self.assertEqual(garage.counter, Counter(2**70))
+        self.assertEqual(garage.reading.extra, {"x": -(2**64)})
+
+    def test_key_transform(self):
+        Garage.objects.create(car=Car("Toyota", 2022, Color.RED, Engine(100)))
+        self.assertEqual(
+            list(Garage.objects.values_list("car__brand", "car__engine")),
+            [("Toyota", {"hp": 100, "kind": "gas"})],
+        )
+        self.assertEqual(
+            list(Garage.objects.values("car__brand")), [{"car__brand": "Toyota"}]
+        )
+
+
+class DumperTests(SimpleTestCase):
+    def test_round_trip(self):
+        car = Car("Toyota", 2022, Color.RED, Engine(100), [Engine(5, "el")], "P")
+        self.assertEqual(round_trip(DataClassField(Car), car), car)
+
+    def test_round_trip_containers(self):
+        field = DataClassField(Options)
+        for options in (
+            Options(),
+            Options(
+                tags=["x"],
+                counts={"a": 1},
+                colors=[Color.RED, Color.BLUE],
+                favourite=Color.BLUE,
+                by_name={"main": Engine(1)},
+                backup=Engine(2, "el"),
+            ),
+        ):
+            self.assertEqual(round_trip(field, options), options)
+
+    def test_prep_value_is_json(self):
+        car = Car("Toyota", 2022, Color.RED, Engine(100))
+        self.assertEqual(
+            DataClassField(Car).get_prep_value(car),
+            {
+                "brand": "Toyota",
+                "year": 2022,
+                "color": "red",
+                "engine": {"hp": 100, "kind": "gas"},
+                "spares": [],
+                "nick": None,
+            },
+        )
+
+    def test_none_dataclass_value(self):
+        car = Car("Toyota", 2022, Color.RED, None)  # type: ignore
+        self.assertIsNone(DataClassField(Car).get_prep_value(car)["engine"])
+
+    def test_subclass_values(self):
+        field = DataClassField(Car)
+        car = Car("Toyota", 2022, Color.RED, TurboEngine(100), [TurboEngine(5, boost=2)])
+        prep = field.get_prep_value(car)
+        self.assertEqual(prep["engine"], {"hp": 100, "kind": "gas", "boost": 1.0})
+        self.assertEqual(prep["spares"], [{"hp": 5, "kind": "gas", "boost": 2}])
+        self.assertEqual(
+            DataClassField(Engine).get_prep_value(TurboEngine(1)),
+            {"hp": 1, "kind": "gas", "boost": 1.0},
+        )
+
+    def test_raw_enum_value(self):
+        car = Car("Toyota", 2022, "blue", Engine(100))  # type: ignore
+        self.assertEqual(DataClassField(Car).get_prep_value(car)["color"], "blue")
+
+    def test_unresolvable_type_hints(self):
+        field = DataClassField(Unresolvable)
+        self.assertIsNot(_dumpers[Unresolvable], _BUILDING)
+        self.assertEqual(field.get_prep_value(Unresolvable("a")), {"x": "a"})
+        self.assertEqual(
+            DataClassField(Unresolvable).get_prep_value(Unresolvable(1)), {"x": 1}
+        )
+
+
+class ToPythonTests(SimpleTestCase):
+    def test_json(self):
+        self.assertEqual(
+            DataClassField(Counter).to_python('{"n": %d}' % 2**70), Counter(2**70)
+        )
+        reading = DataClassField(Reading).to_python('{"value": NaN}')
+        self.assertNotEqual(reading.value, reading.value)
+
+
+class FormFieldTests(SimpleTestCase):
+    def test_to_python(self):
+        field = DataClassField(Counter).formfield()
+        self.assertEqual(field.to_python('{"n": %d}' % 2**70), {"n": 2**70})
+        value = field.to_python('{"n": NaN}')["n"]
+        self.assertNotEqual(value, value)
+        with self.assertRaises(ValidationError):
+            field.to_python('{"n": }')
+
+    def test_has_changed(self):
+        field = DataClassField(Engine).formfield()
+        self.assertFalse(field.has_changed(Engine(1), '{"kind": "gas", "hp": 1}'))
+        self.assertTrue(
+            field.has_changed({"hp": True, "kind": "gas"}, '{"hp": 1, "kind": "gas"}')
+        )
+        self.assertTrue(field.has_changed(Engine(1), '{"hp": 2, "kind": "gas"}'))
+        self.assertTrue(field.has_changed(Engine(1), '{"hp": 1, "kind": '))
+
+    def test_bound_data_reuses_to_python(self):
+        field = DataClassField(Engine).formfield()
+        data = '{"hp": 1, "kind": "gas"}'
+        converted = field.to_python(data)
+        self.assertIs(field.bound_data(data, None), converted)
+        # an equal but different string is decoded again
+        other = "".join(['{"hp": 1, ', '"kind": "gas"}'])
+        self.assertIsNot(other, data)
+        bound = field.bound_data(other, None)
+        self.assertIsNot(bound, converted)
+        self.assertEqual(bound, converted)
+
+
+@unittest.skipIf(sys.version_info < (3, 10), "auto_slots needs Python 3.10+")
+class SlottedCopyTests(SimpleTestCase):
+    def test_copy(self):
+        slotted = _slotted_copy(Point)
+        self.assertIsNot(slotted, Point)
+        self.assertIs(_slotted_copy(Point), slotted)
+        self.assertFalse(hasattr(slotted(1), "__dict__"))
+        self.assertEqual(slotted.__module__, Point.__module__)
+        self.assertEqual(slotted.__qualname__, Point.__qualname__)
+
+    def test_defaults(self):
+        slotted = _slotted_copy(Point)
+        first, second = slotted(1), slotted(2)
+        self.assertEqual((first.y, first.labels), (0, []))
+        self.assertIsNot(first.labels, second.labels)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            first.x = 2  # type: ignore
+
+    def test_methods_and_docstring(self):
+        slotted = _slotted_copy(Point)
+        self.assertEqual(slotted(3, -4).norm(), 7)
+        self.assertEqual(slotted.__doc__, "A point.")
+
+    def test_zero_argument_super_fails(self):
+        with self.assertRaises(TypeError):
+            _slotted_copy(Point)(1).describe()
+
+    def test_field(self):
+        field = SlottedDataClassField(Point)
+        self.assertIs(field.data_class, _slotted_copy(Point))
+        point = round_trip(field, Point(1, 2, ["a"]))
+        self.assertIs(type(point), field.data_class)
+        self.assertEqual((point.x, point.y, point.labels), (1, 2, ["a"]))
+        # instances of the original class can still be saved
+        self.assertEqual(
+            field.get_prep_value(point), field.get_prep_value(Point(1, 2, ["a"]))
+        )
+        field.validate(Point(1), None)
+
+    def test_init_vars(self):
+        self.assertIs(_slotted_copy(Scaled), Scaled)
+        field = SlottedDataClassField(Scaled)
+        self.assertIs(field.data_class, Scaled)
+        self.assertEqual(load(field, {"a": 2}), Scaled(2))
+
+    def test_keeps_defined_methods(self):
+        slotted = _slotted_copy(Tag)
+        self.assertIsNot(slotted, Tag)
+        self.assertEqual(repr(slotted("a")), "#a")
+        self.assertEqual(slotted("a"), slotted("A"))
+        self.assertEqual(repr(_slotted_copy(Point)(1)), "Point(x=1, y=0, labels=[])")
+
+    def test_form_field(self):
+        form_field = SlottedDataClassField(Point).formfield()
+        data = '{"x": 1, "y": 0, "labels": []}'
+        self.assertFalse(form_field.has_changed(Point(1), data))
+        self.assertFalse(form_field.has_changed(_slotted_copy(Point)(1), data))
+        self.assertTrue(form_field.has_changed(Point(2), data))
+
+    def test_deconstruct_keeps_original_path(self):
+        _, _, _, kwargs = SlottedDataClassField(Point).deconstruct()
+        data_class = kwargs["data_class"]
+        self.assertIs(
+            import_string("%s.%s" % (data_class.__module__, data_class.__qualname__)),
+            Point,
+        )
+
+
+@unittest.skipIf(msgspec is None, "msgspec is not installed")
+class StructTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        class Wheel(msgspec.Struct):
+            size: int
+            color: Color = Color.RED
+
+        @dataclasses.dataclass
+        class Bike:
+            front: Wheel
+
+        cls.Wheel = Wheel
+        cls.Bike = Bike
+
+    def test_round_trip(self):
+        field = DataClassField(self.Wheel)
+        wheel = self.Wheel(26, Color.BLUE)
+        self.assertEqual(field.get_prep_value(wheel), {"size": 26, "color": "blue"})
+        self.assertEqual(round_trip(field, wheel), wheel)
+
+    def test_nested_in_dataclass(self):
+        bike = self.Bike(self.Wheel(29))
+        self.assertEqual(round_trip(DataClassField(self.Bike), bike), bike)
+
+    def test_to_python(self):
+        field = DataClassField(self.Wheel)
+        self.assertEqual(field.to_python('{"size": 20}'), self.Wheel(20))
+        with self.assertRaises(ValidationError):
+            field.to_python('{"size": "big"}')
+
+    def test_schema(self):
+        schema = json.loads(DataClassField(self.Wheel).formfield().widget.attrs["schema"])
+        self.assertEqual(schema, msgspec.json.schema(self.Wheel))